@@ -1,9 +1,63 @@
+import functools
+import os
 import re
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+# Precompiled once so hot paths don't re-hash/re-dispatch the patterns
+_WS_RE = re.compile(r"\s+")
+_NONWORD_RE = re.compile(r"[^a-z0-9_]")
+_NONDIGIT_RE = re.compile(r"\D")
+_NUMERIC_RE = re.compile(r"^\s*-?\d+(?:\.\d+)?\s*$")
+
+# Arrow-backed strings dispatch .str ops to SIMD C++ kernels when available
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    _STRING_DTYPE = "string"
+
+# Optional Numba JIT for clipping very tall float columns; below this
+# row count compile overhead dominates, so pandas clip is used instead
+_NUMBA_MIN_ROWS = 100_000
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, cache=True)
+    def _clip_iqr(arr, lower, upper):
+        out = np.empty_like(arr)
+        for i in prange(arr.size):
+            v = arr[i]
+            if v < lower:
+                out[i] = lower
+            elif v > upper:
+                out[i] = upper
+            else:
+                out[i] = v  # NaN falls through unchanged
+        return out
+
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# Values treated as missing (compared after strip + lowercase)
+EMPTY_LIKE_SET = frozenset(["n/a", "na", "none", "null", "unknown", "?", "??", "-", "", " "])
+
+# One combined pattern to bucket column names by role in a single pass
+_CAT_RE = re.compile(
+    r"(?P<date>date|admission|discharge|dob)"
+    r"|(?P<phone>phone|mobile|contact)"
+    r"|(?P<id>id)"
+    r"|(?P<gender>gender|sex)"
+    r"|(?P<age>age)"
+    r"|(?P<cost>bill|cost|charge|amount|price|payment)"
+    r"|(?P<name>name|patient)"
+)
+_COL_CATEGORIES = ("date", "phone", "id", "gender", "age", "cost", "name")
+
 
 # -------------------------
 # Utilities
@@ -11,32 +65,74 @@ import pandas as pd
 def clean_column_name(col: str) -> str:
     """Standardize column names to snake_case."""
     col = str(col).strip().lower()
-    col = re.sub(r"\s+", "_", col)
-    col = re.sub(r"[^a-z0-9_]", "", col)
+    col = _WS_RE.sub("_", col)
+    col = _NONWORD_RE.sub("", col)
     return col
 
 
 def missing_report(df: pd.DataFrame) -> pd.DataFrame:
-    """Create missing-value report (count + %)."""
-    miss = df.isna().sum()
+    """Create missing-value report (count + %).
+
+    Counts column by column so only one boolean Series is alive at a
+    time, instead of materializing a bool copy of the whole frame.
+    """
+    miss = pd.Series({c: df[c].isna().sum() for c in df.columns}, dtype="int64")
     pct = (miss / len(df)) * 100
     rep = pd.DataFrame({"missing_count": miss, "missing_pct": pct.round(2)})
     return rep.sort_values("missing_pct", ascending=False)
 
 
 def clean_phone(x):
-    """Keep digits only, validate length, else NaN."""
+    """Keep digits only, validate length, else NaN (scalar fallback)."""
     if pd.isna(x):
         return np.nan
-    digits = re.sub(r"\D", "", str(x))
+    digits = _NONDIGIT_RE.sub("", str(x))
     if len(digits) < 10 or len(digits) > 15:
         return np.nan
     return digits
 
 
+def clean_phone_series(s: pd.Series) -> pd.Series:
+    """Vectorized phone cleaning: keep digits only, null out bad lengths."""
+    digits = s.astype(_STRING_DTYPE).str.replace(r"\D", "", regex=True)
+    lens = digits.str.len()
+    return digits.mask((lens < 10) | (lens > 15))
+
+
+def clean_phone_arrow(s: pd.Series) -> pd.Series:
+    """Phone cleaning on Arrow compute kernels (RE2 regex, no Python loop).
+
+    Falls back to the pandas Series pipeline when pyarrow is missing.
+    """
+    try:
+        import pyarrow.compute as pc
+    except ImportError:
+        return clean_phone_series(s)
+
+    arr = s.astype("string[pyarrow]").array._pa_array
+    digits = pc.replace_substring_regex(arr, pattern=r"\D", replacement="")
+    lens = pc.utf8_length(digits)
+    mask = pc.and_(pc.greater_equal(lens, 10), pc.less_equal(lens, 15))
+    cleaned = pd.array(pc.if_else(mask, digits, None), dtype="string[pyarrow]")
+    return pd.Series(cleaned, index=s.index, name=s.name)
+
+
+def parse_dates(s: pd.Series) -> pd.Series:
+    """Parse dates, trying the fast ISO8601 path before mixed formats.
+
+    Passing an explicit format skips pandas' per-element format
+    inference; the mixed fallback only runs when most values fail ISO.
+    """
+    parsed = pd.to_datetime(s, format="ISO8601", errors="coerce")
+    if parsed.isna().mean() > 0.5:
+        parsed = pd.to_datetime(s, format="mixed", dayfirst=False, errors="coerce")
+    return parsed
+
+
 def cap_outliers_iqr(series: pd.Series) -> pd.Series:
     """Cap outliers using the IQR method."""
-    if series.dropna().shape[0] < 5:
+    # count() gives the non-null total without materializing a filtered copy
+    if series.count() < 5:
         return series
 
     q1 = series.quantile(0.25)
@@ -51,6 +147,124 @@ def cap_outliers_iqr(series: pd.Series) -> pd.Series:
     return series.clip(lower, upper)
 
 
+def cap_outliers_iqr_frame(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    """Cap outliers for several numeric columns in one quantile + clip pass."""
+    if not cols:
+        return df
+    qs = df[cols].quantile([0.25, 0.75])
+    q1, q3 = qs.iloc[0], qs.iloc[1]
+    iqr = q3 - q1
+
+    # Leave constant, all-NaN or tiny columns untouched (same rules as
+    # the per-series version)
+    skip = (iqr == 0) | iqr.isna() | (df[cols].count() < 5)
+    lower = (q1 - 1.5 * iqr).mask(skip, -np.inf)
+    upper = (q3 + 1.5 * iqr).mask(skip, np.inf)
+
+    # Tall float64 columns go through the parallel Numba kernel
+    jit_cols = []
+    if _HAS_NUMBA and len(df) > _NUMBA_MIN_ROWS:
+        jit_cols = [c for c in cols if df[c].dtype == np.float64 and not skip[c]]
+        for c in jit_cols:
+            df[c] = _clip_iqr(df[c].to_numpy(), lower[c], upper[c])
+
+    rest = [c for c in cols if c not in jit_cols]
+    if rest:
+        df[rest] = df[rest].clip(lower=lower[rest], upper=upper[rest], axis=1)
+    return df
+
+
+class PipelinePlan(NamedTuple):
+    """Schema-derived decisions, reusable across frames with the same columns."""
+    clean_names: Tuple[str, ...]
+    cats: dict
+
+
+@functools.cache
+def _plan_pipeline(cols: Tuple[str, ...]) -> PipelinePlan:
+    """Memoized plan keyed on the raw column tuple.
+
+    Batched loads of the same CSV schema skip the column-name
+    normalization and category detection entirely after the first run.
+    """
+    clean_names = tuple(clean_column_name(c) for c in cols)
+    return PipelinePlan(clean_names=clean_names, cats=_categorize_columns(clean_names))
+
+
+# Below this many columns, thread startup costs more than it saves
+_MIN_PARALLEL_COLS = 4
+
+
+def _map_columns(df: pd.DataFrame, cols, fn) -> None:
+    """Apply fn to each column, threading when there are enough columns.
+
+    The Arrow/NumPy kernels behind the per-column stages release the
+    GIL, so independent columns scale across cores; small frames keep
+    the plain loop.
+    """
+    cols = list(cols)
+    if len(cols) >= _MIN_PARALLEL_COLS:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            results = list(ex.map(fn, [df[c] for c in cols]))
+        for c, v in zip(cols, results):
+            df[c] = v
+    else:
+        for c in cols:
+            df[c] = fn(df[c])
+
+
+def _strip_empty_like(s: pd.Series) -> pd.Series:
+    """Trim a text column and null out empty-like values in one pass."""
+    s = s.astype(_STRING_DTYPE).str.strip()
+    return s.mask(s.str.lower().isin(EMPTY_LIKE_SET))
+
+
+def _maybe_to_numeric(s: pd.Series) -> pd.Series:
+    """Convert a numeric-looking text column, or return it unchanged."""
+    sample = s.dropna().head(1000)
+    if len(sample) == 0 or sample.str.match(_NUMERIC_RE.pattern).mean() <= 0.70:
+        return s
+    converted = pd.to_numeric(s, errors="coerce")
+    return converted if converted.notna().mean() > 0.70 else s
+
+
+def _categorize_columns(cols) -> dict:
+    """Bucket column names by role (date/phone/id/...) in one regex pass.
+
+    A column can land in several buckets (e.g. "patientid" is both a
+    name and an id column), matching the old keyword scans.
+    """
+    cats = {cat: [] for cat in _COL_CATEGORIES}
+    for c in cols:
+        seen = set()
+        for m in _CAT_RE.finditer(c):
+            group = m.lastgroup
+            if group not in seen:
+                seen.add(group)
+                cats[group].append(c)
+    return cats
+
+
+def partition_cols(df: pd.DataFrame) -> dict:
+    """Partition columns into numeric/string/datetime/category in one dtypes pass."""
+    num, text, dt, cat = [], [], [], []
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            cat.append(col)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            num.append(col)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            dt.append(col)
+        elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+            text.append(col)
+    return {
+        "num": pd.Index(num),
+        "str": pd.Index(text),
+        "dt": pd.Index(dt),
+        "cat": pd.Index(cat),
+    }
+
+
 def find_first_existing(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
     """Return the first column name that exists in df from a candidate list."""
     for c in candidates:
@@ -62,14 +276,178 @@ def find_first_existing(df: pd.DataFrame, candidates: List[str]) -> Optional[str
 # -------------------------
 # Load / Save
 # -------------------------
+def _detect_encoding(path) -> Optional[str]:
+    """Probe a 64KB sample; None means UTF-8 is fine, else a guess.
+
+    chardet refines the guess when installed, otherwise latin1 (which
+    accepts any byte) is used.
+    """
+    with open(path, "rb") as fh:
+        sample = fh.read(65536)
+    try:
+        sample.decode("utf-8")
+        return None
+    except UnicodeDecodeError as exc:
+        # A multi-byte char cut off at the sample edge is not a failure
+        if exc.start >= len(sample) - 4:
+            return None
+    try:
+        import chardet
+    except ImportError:
+        return "latin1"
+    return chardet.detect(sample).get("encoding") or "latin1"
+
+
 def load_csv_safe(path) -> pd.DataFrame:
-    """Load CSV with encoding fallback (prevents common Kaggle decode errors)."""
+    """Load CSV with the multi-threaded PyArrow parser and encoding fallback.
+
+    pyarrow does not raise UnicodeDecodeError on non-UTF8 input -- it
+    silently yields bytes columns -- so the encoding is probed up front
+    and passed into the reader instead of relied on as an exception.
+    """
+    encoding = _detect_encoding(path)
+    try:
+        return pd.read_csv(path, engine="pyarrow", encoding=encoding)
+    except ImportError:
+        pass  # pyarrow not installed -> default parser below
+    except (UnicodeDecodeError, ValueError):
+        return pd.read_csv(path, encoding=encoding or "latin1")
+
     try:
-        return pd.read_csv(path)
+        return pd.read_csv(path, encoding=encoding)
     except UnicodeDecodeError:
         return pd.read_csv(path, encoding="latin1")
 
 
+# -------------------------
+# Polars (lazy) pipeline
+# -------------------------
+def _missing_report_from_counts(counts, n_rows: int) -> pd.DataFrame:
+    """Build the standard missing report from precomputed null counts."""
+    miss = pd.Series(counts)
+    pct = (miss / n_rows * 100) if n_rows else miss * 0.0
+    rep = pd.DataFrame({"missing_count": miss, "missing_pct": pct.round(2)})
+    return rep.sort_values("missing_pct", ascending=False)
+
+
+def clean_hospital_records_polars(path) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Lazy/streaming variant of clean_hospital_records built on Polars.
+
+    Scans the CSV lazily so the optimizer can fuse the string/date/phone
+    steps and stream in chunks instead of materializing a copy per step.
+    Falls back to the pandas pipeline when polars is not installed.
+    Returns the same (df_clean, missing_before, missing_after) tuple,
+    all as pandas DataFrames.
+    """
+    try:
+        import polars as pl
+    except ImportError:
+        return clean_hospital_records(load_csv_safe(path))
+
+    lf = pl.scan_csv(path, infer_schema_length=10_000)
+    lf = lf.rename({c: clean_column_name(c) for c in lf.collect_schema().names()})
+    schema = lf.collect_schema()
+
+    # Report before (null counts only; no full materialization)
+    n_rows = lf.select(pl.len()).collect().item()
+    raw_nulls = lf.select(pl.all().null_count()).collect().row(0, named=True)
+    missing_before = _missing_report_from_counts(raw_nulls, n_rows)
+
+    # Trim + empty-like -> null, fused into one pass per string column
+    empty_like = ["n/a", "na", "none", "null", "unknown", "?", "??", "-", ""]
+    str_cols = [c for c, dt in schema.items() if dt == pl.String]
+    if str_cols:
+        stripped = pl.col(str_cols).str.strip_chars()
+        lf = lf.with_columns(
+            pl.when(stripped.str.to_lowercase().is_in(empty_like))
+            .then(None)
+            .otherwise(stripped)
+            .name.keep()
+        )
+
+    # Drop duplicate rows
+    lf = lf.unique(maintain_order=True)
+
+    # Gender/sex cleaning
+    gender_col = next((c for c in ("gender", "sex") if c in schema), None)
+    if gender_col is not None and schema[gender_col] == pl.String:
+        gender_map = {
+            "m": "male", "male": "male", "man": "male",
+            "f": "female", "female": "female", "woman": "female"
+        }
+        lf = lf.with_columns(
+            pl.col(gender_col).str.to_lowercase().replace_strict(gender_map, default=None)
+        )
+
+    # Age cleaning
+    if "age" in schema:
+        age = pl.col("age").cast(pl.Float64, strict=False)
+        lf = lf.with_columns(
+            pl.when((age < 0) | (age > 120)).then(None).otherwise(age).alias("age")
+        )
+
+    # Date-like columns
+    date_cols = [
+        c for c in schema
+        if any(k in c for k in ["date", "admission", "discharge", "dob"])
+        and schema[c] == pl.String
+    ]
+    if date_cols:
+        lf = lf.with_columns(pl.col(date_cols).str.to_datetime(strict=False, exact=False))
+    if "admission_date" in schema and "discharge_date" in schema:
+        bad = pl.col("discharge_date") < pl.col("admission_date")
+        lf = lf.with_columns(
+            pl.when(bad).then(None).otherwise(pl.col("admission_date")).alias("admission_date"),
+            pl.when(bad).then(None).otherwise(pl.col("discharge_date")).alias("discharge_date"),
+        )
+
+    # Phone columns: digits only, validate length
+    phone_cols = [c for c in schema if any(k in c for k in ["phone", "mobile", "contact"])]
+    if phone_cols:
+        digits = pl.col(phone_cols).cast(pl.String).str.replace_all(r"\D", "")
+        lens = digits.str.len_chars()
+        lf = lf.with_columns(
+            pl.when((lens < 10) | (lens > 15)).then(None).otherwise(digits).name.keep()
+        )
+
+    df_pl = lf.collect(engine="streaming")
+
+    # Numeric-looking text columns (data-dependent, so done eagerly)
+    for col in df_pl.columns:
+        if df_pl.schema[col] == pl.String:
+            converted = df_pl[col].cast(pl.Float64, strict=False)
+            if len(df_pl) and (1 - converted.null_count() / len(df_pl)) > 0.70:
+                df_pl = df_pl.with_columns(converted.alias(col))
+
+    # Cap outliers (IQR) for numeric columns, skipping ids
+    for col in df_pl.columns:
+        if df_pl.schema[col].is_numeric() and "id" not in col:
+            s = df_pl[col]
+            if len(s) - s.null_count() < 5:
+                continue
+            q1, q3 = s.quantile(0.25), s.quantile(0.75)
+            iqr = q3 - q1
+            if not iqr:
+                continue
+            df_pl = df_pl.with_columns(
+                s.clip(q1 - 1.5 * iqr, q3 + 1.5 * iqr).alias(col)
+            )
+
+    # Imputation: numeric -> median, text -> "unknown"
+    df_pl = df_pl.with_columns(
+        [pl.col(c).fill_null(pl.col(c).median())
+         for c in df_pl.columns if df_pl.schema[c].is_numeric()]
+        + [pl.col(c).fill_null("unknown")
+           for c in df_pl.columns if df_pl.schema[c] == pl.String]
+    )
+
+    missing_after = _missing_report_from_counts(
+        df_pl.null_count().row(0, named=True), len(df_pl)
+    )
+    return df_pl.to_pandas(), missing_before, missing_after
+
+
 # -------------------------
 # Main cleaning pipeline
 # -------------------------
@@ -79,25 +457,30 @@ def clean_hospital_records(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataF
     Returns:
       df_clean, missing_before, missing_after
     """
-    df = df_raw.copy()
-
     # Report before
-    missing_before = missing_report(df)
-
-    # 1) Clean column names
-    df.columns = [clean_column_name(c) for c in df.columns]
-
-    # 2) Replace empty-like values with NaN
-    empty_like = ["n/a", "na", "none", "null", "unknown", "?", "??", "-", "", " "]
-    df = df.replace(empty_like, np.nan)
-
-    # 3) Drop duplicate rows
-    df = df.drop_duplicates().reset_index(drop=True)
-
-    # 4) Trim text columns
-    text_cols = df.select_dtypes(include=["object"]).columns.tolist()
-    for col in text_cols:
-        df[col] = df[col].astype("string").str.strip()
+    missing_before = missing_report(df_raw)
+
+    # Shallow copy: shares data blocks (copy-on-write protects df_raw),
+    # so peak memory no longer doubles at load time
+    df = df_raw.copy(deep=False)
+
+    # 1) Clean column names and bucket them by role; the plan is cached
+    # per schema so repeated runs over identical columns skip this work
+    plan = _plan_pipeline(tuple(df.columns))
+    df.columns = list(plan.clean_names)
+    cats = plan.cats
+
+    # 2 + 4) Trim text and null out empty-like values in one pass per
+    # string column; isin is a C-level hashset probe, far cheaper than
+    # df.replace with a list
+    cols_by_dtype = partition_cols(df)
+    _map_columns(df, cols_by_dtype["str"], _strip_empty_like)
+
+    # 3) Drop duplicate rows. Keying on the id columns (when present)
+    # hashes one column instead of the whole row; without an id there is
+    # no subset that still uniquely identifies a row, so hash everything.
+    dedup_subset = cats["id"] or None
+    df = df.drop_duplicates(subset=dedup_subset).reset_index(drop=True)
 
     # 5) Gender/sex cleaning (only if exists)
     gender_col = find_first_existing(df, ["gender", "sex"])
@@ -106,7 +489,9 @@ def clean_hospital_records(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataF
             "m": "male", "male": "male", "man": "male",
             "f": "female", "female": "female", "woman": "female"
         }
-        df[gender_col] = df[gender_col].astype("string").str.lower().map(gender_map)
+        df[gender_col] = (
+            df[gender_col].astype(_STRING_DTYPE).str.lower().map(gender_map).astype("category")
+        )
 
     # 6) Age cleaning (only if exists)
     if "age" in df.columns:
@@ -114,9 +499,7 @@ def clean_hospital_records(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataF
         df.loc[(df["age"] < 0) | (df["age"] > 120), "age"] = np.nan
 
     # 7) Parse date-like columns (auto detect)
-    date_cols = [c for c in df.columns if any(k in c for k in ["date", "admission", "discharge", "dob"])]
-    for col in date_cols:
-        df[col] = pd.to_datetime(df[col], errors="coerce")
+    _map_columns(df, cats["date"], parse_dates)
 
     # Admission/Discharge logical check (optional if both exist)
     if "admission_date" in df.columns and "discharge_date" in df.columns:
@@ -124,31 +507,46 @@ def clean_hospital_records(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataF
         df.loc[bad, ["admission_date", "discharge_date"]] = pd.NaT
 
     # 8) Phone cleaning (auto detect)
-    phone_cols = [c for c in df.columns if any(k in c for k in ["phone", "mobile", "contact"])]
-    for c in phone_cols:
-        df[c] = df[c].apply(clean_phone)
+    _map_columns(df, cats["phone"], clean_phone_arrow)
+
+    # 9) Convert numeric-looking text columns safely. A cheap regex
+    # check on a 1000-value sample skips the full to_numeric parse for
+    # obviously-text columns (names, addresses, ...).
+    numeric_candidates = [
+        c for c in df.columns
+        if df[c].dtype == "object" or str(df[c].dtype) == "string"
+    ]
+    _map_columns(df, numeric_candidates, _maybe_to_numeric)
 
-    # 9) Convert numeric-looking text columns safely
-    for col in df.columns:
-        if df[col].dtype == "object" or str(df[col].dtype) == "string":
-            converted = pd.to_numeric(df[col], errors="coerce")
-            if converted.notna().mean() > 0.70:
-                df[col] = converted
+    # Refresh the dtype partition once after type-changing steps 7-9
+    cols_by_dtype = partition_cols(df)
 
     # 10) Cap outliers for numeric columns (skip id columns)
-    num_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    for col in num_cols:
-        if "id" not in col:
-            df[col] = cap_outliers_iqr(df[col])
+    cap_cols = [c for c in cols_by_dtype["num"] if "id" not in c]
+    df = cap_outliers_iqr_frame(df, cap_cols)
 
     # 11) Imputation
-    # Numeric -> median
-    for col in df.select_dtypes(include=["int64", "float64"]).columns:
-        df[col] = df[col].fillna(df[col].median())
+    # Numeric -> median (single vectorized pass over the numeric block)
+    num_cols = cols_by_dtype["num"]
+    medians = df[num_cols].median(numeric_only=True)
+    df[num_cols] = df[num_cols].fillna(medians)
 
     # Text -> "unknown"
-    for col in df.select_dtypes(include=["string", "object"]).columns:
-        df[col] = df[col].fillna("unknown")
+    df[cols_by_dtype["str"]] = df[cols_by_dtype["str"]].fillna("unknown")
+
+    # Categorical -> "unknown" (the fill value must be a known category)
+    for col in cols_by_dtype["cat"]:
+        if df[col].isna().any():
+            if "unknown" not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories("unknown")
+            df[col] = df[col].fillna("unknown")
+
+    # 12) Downcast low-cardinality text to category: values are stored
+    # once plus small integer codes instead of one string per row
+    cat_threshold = min(1000, len(df) * 0.05)
+    for col in cols_by_dtype["str"]:
+        if df[col].nunique() < cat_threshold:
+            df[col] = df[col].astype("category")
 
     # Report after
     missing_after = missing_report(df)
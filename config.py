@@ -10,7 +10,7 @@ FIG_DIR = REPORTS_DIR / "figures"
 
 # Default raw file name (can be overridden in run script)
 DEFAULT_RAW_FILE = "hospital_patients_real_world.csv"
-DEFAULT_CLEAN_FILE = "hospital_records_cleaned.csv"
+DEFAULT_CLEAN_FILE = "hospital_records_cleaned.parquet"
 
 
 def ensure_folders() -> None: